@@ -0,0 +1,43 @@
+from typing import Dict, List
+
+import orjson
+import xxhash
+
+# This module is compiled with mypyc in the Docker image, when the extension
+# module is not built Python imports this source file instead.
+
+_XXH3 = xxhash.xxh3_64_intdigest
+_SORT_KEYS = orjson.OPT_SORT_KEYS
+
+
+def _canonical(request: Dict) -> bytes:
+    """
+    Serialize the fields that identify a JSON-RPC request.
+    Only the method, params and protocol version identify a request, so no id-less copy of the body is needed.
+
+    :param request: A single JSON-RPC request.
+    :return: Canonical JSON bytes of (method, params, jsonrpc).
+    """
+    return orjson.dumps((request.get('method'), request.get('params'), request.get('jsonrpc')), option=_SORT_KEYS)
+
+
+def generate_cache_key(chain: str, body: Dict) -> int:
+    """
+    Generate a unique 64-bit cache key based on the chain and request body.
+    Batches are keyed per sub-request, see combine_cache_keys.
+
+    :param chain: The identifier for the blockchain network.
+    :param body: A single JSON-RPC request.
+    :return: The cache key.
+    """
+    return _XXH3(chain.encode() + b'\x00' + _canonical(body))
+
+
+def combine_cache_keys(cache_keys: List[int]) -> int:
+    """
+    Combine already computed cache keys into one key, independent of their order.
+
+    :param cache_keys: The cache keys of the sub-requests of a batch.
+    :return: The combined cache key.
+    """
+    return _XXH3(orjson.dumps(sorted(cache_keys)))
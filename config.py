@@ -1,4 +1,5 @@
 import os
+import sys
 from typing import Dict
 from dotenv import load_dotenv
 
@@ -23,6 +24,7 @@ class Config:
     # Server settings
     HOST: str = get_env('HOST', '0.0.0.0')
     PORT: int = int(get_env('PORT', '8080'))
+    WORKERS: int = int(get_env('WORKERS', str(os.cpu_count() or 1)))
 
     # RPC settings
     RPC_URL: Dict[str, str] = {}
@@ -33,7 +35,7 @@ class Config:
     def load_rpc_configs(cls):
         for key, value in os.environ.items():
             if key.startswith("RPC_"):
-                chain = key[4:].lower()
+                chain = sys.intern(key[4:].lower())
                 cls.RPC_URL[chain] = value
 
                 ws_key = f"WS_{chain.upper()}"
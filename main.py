@@ -1,20 +1,92 @@
-import time
+import re
+import sys
 import json
+import time
 import uuid
 import asyncio
-import hashlib
-from typing import Union, Dict, List, Tuple
-from collections import deque
+from typing import Union, Dict, List, Tuple, Callable, Awaitable, Optional
 from contextlib import asynccontextmanager
 
 import aiohttp
+import orjson
 import uvicorn
+from yarl import URL
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 
-from cache import ChainSpecificTTLCache
+from cache import TTLCache
+from cache_key import generate_cache_key, combine_cache_keys
 from config import config
-from utils.logger import logger
+from utils.logger import logger, is_level_enabled
+
+_UPSTREAM_TIMEOUT = aiohttp.ClientTimeout(total=30)
+_UPSTREAM_HEADERS = {"Content-Type": "application/json"}  # Shared by every upstream request
+_LOG_INFO = is_level_enabled("INFO")
+_LOG_DEBUG = is_level_enabled("DEBUG")  # Request bodies are only logged at DEBUG
+# Batches with at most this many misses send them as concurrent single requests instead of one batch
+_MAX_SPLIT_BATCH_MISSES = 3
+
+# Methods whose responses must never be served from cache (writes, subscriptions and filters)
+NON_CACHEABLE_METHODS = frozenset({
+    "eth_sendRawTransaction",
+    "eth_sendTransaction",
+    "eth_subscribe",
+    "eth_unsubscribe",
+    "eth_newFilter",
+    "eth_newBlockFilter",
+    "eth_newPendingTransactionFilter",
+    "eth_getFilterChanges",
+    "eth_uninstallFilter",
+    "sendTransaction",
+})
+
+# Request log line with placeholders for the JSON-encoded values of a queued log row,
+# the third one takes the optional '"request_body":...,' member
+_ACCESS_LOG_TEMPLATE = (
+    b'{"remote_addr":%b,"x_forwarded_for":%b,%b"status":"200",'
+    b'"upstream_cache_status":%b,"upstream_response_time":%b,"total_response_time":%b,'
+    b'"cache_key":%b,"request_uri":%b}'
+)
+
+
+# A JSON number token with more digits than a 64-bit integer can hold. orjson silently parses such
+# integers as floats, so data matching this is handled with the stdlib json module instead. Hex strings
+# never match, string contents that do only cost the slower exact path.
+_LONG_INT = re.compile(rb'[\[,:\s](?:-\d{19}|\d{20})')
+
+
+def _loads(data: bytes):
+    """
+    Parse JSON with orjson, or with the stdlib json module when integers beyond 64 bits may be present,
+    so they are kept exact instead of being turned into floats.
+    """
+    return json.loads(data) if _LONG_INT.search(data) else orjson.loads(data)
+
+
+def _dumps(obj) -> bytes:
+    """
+    Serialize JSON with orjson, falling back to the stdlib json module for integers beyond 64 bits.
+    """
+    try:
+        return orjson.dumps(obj)
+    except orjson.JSONEncodeError:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _strip_id(response: Dict) -> bytes:
+    """
+    Serialize a JSON-RPC response without its id, in the form it is cached:
+    the object minus its opening brace, so an id can be put in front without copying it twice.
+    """
+    members = _dumps({k: v for k, v in response.items() if k != 'id'})[1:]
+    return members if members == b'}' else b',' + members
+
+
+def _with_id(cached_response: bytes, request_id) -> bytes:
+    """
+    Splice a request id into a cached, id-less JSON-RPC response without re-serializing it.
+    """
+    return b''.join((b'{"id":', orjson.dumps(request_id), cached_response))
 
 
 @asynccontextmanager
@@ -24,15 +96,27 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events.
     """
     # Startup
-    proxy.session = aiohttp.ClientSession()
+    proxy.load_chains()
+    proxy.start_access_log()
+    connector = aiohttp.TCPConnector(
+        limit=0,  # No global cap, upstream concurrency is bounded per host
+        limit_per_host=256,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+        enable_cleanup_closed=True,
+    )
+    proxy.session = aiohttp.ClientSession(connector=connector)
     yield
     # Shutdown
     logger.info("Shutting down JSON-RPC Cache Proxy")
+    await proxy.stop_access_log()
     if proxy.session:
         await proxy.session.close()
+    # Flush records still queued for the log sink
+    await logger.complete()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 class JSONRPCCacheProxy:
@@ -40,142 +124,331 @@ class JSONRPCCacheProxy:
     Handles caching and proxying of JSON-RPC requests to various blockchain nodes.
     """
 
+    __slots__ = (
+        "cache",
+        "cache_statuses",
+        "cache_status_index",
+        "cache_status_counts",
+        "last_ratio_log",
+        "session",
+        "_chains",
+        "_inflight",
+        "_log_queue",
+        "_log_task",
+    )
+
+    generate_cache_key = staticmethod(generate_cache_key)
+
     def __init__(self):
-        self.cache = ChainSpecificTTLCache()
-        self.cache_statuses = deque(maxlen=1000)  # Store last 1000 cache statuses for cache ratio calculations
+        # One cache for all chains (keys include the chain), sized like one 1000-entry cache per chain
+        self.cache = TTLCache(maxsize=1000 * max(len(config.RPC_URL), 1))
+        self.cache_statuses: List[Optional[str]] = [None] * 1000  # Ring buffer of the last 1000 cache statuses for cache ratio calculations
+        self.cache_status_index = 0  # Next slot to overwrite in cache_statuses
+        self.cache_status_counts = {"HIT": 0, "MISS": 0, "EXPIRED": 0, "BYPASS": 0}  # Running counts over cache_statuses
         self.last_ratio_log = time.time()
         self.session = None
+        self._chains: Dict[str, Tuple[URL, int]] = {}
+        self._inflight: Dict[int, asyncio.Future] = {}  # Upstream fetches in progress, by cache key
+        self._log_queue: Optional[asyncio.Queue] = None  # Request log rows waiting to be written
+        self._log_task: Optional[asyncio.Task] = None
+
+    def load_chains(self):
+        """
+        Resolve the parsed RPC URL and cache TTL (in nanoseconds) of every configured chain once,
+        so the request path needs a single dict lookup per chain and no URL parsing.
+        """
+        self._chains = {
+            chain: (URL(rpc_url), config.CACHE_TTL[chain] * 1_000_000_000)
+            for chain, rpc_url in config.RPC_URL.items()
+        }
+
+    def start_access_log(self):
+        """
+        Start the background task that writes request log lines,
+        must be called from within the running event loop.
+        """
+        self._log_queue = asyncio.Queue(maxsize=10000)
+        self._log_task = asyncio.ensure_future(self._access_log_worker())
+
+    async def stop_access_log(self):
+        """
+        Stop the request log task and write out any rows still queued.
+        """
+        if self._log_task is None:
+            return
+        self._log_task.cancel()
+        try:
+            await self._log_task
+        except asyncio.CancelledError:
+            pass
+        while not self._log_queue.empty():
+            self._write_access_log(self._log_queue.get_nowait())
+        self._log_task = None
+
+    async def _access_log_worker(self):
+        """
+        Write queued request log rows out one by one, off the request path.
+        """
+        queue = self._log_queue
+        while True:
+            row = await queue.get()
+            try:
+                self._write_access_log(row)
+            except Exception as e:
+                logger.error(f"Failed to write request log: {str(e)}")
 
     @staticmethod
-    def generate_cache_key(chain: str, body: Union[Dict, List]) -> str:
+    def _write_access_log(row: Tuple):
+        remote_addr, x_forwarded_for, rpc_request, cache_status, upstream_time, total_request_time, cache_key, request_uri = row
+        dumps = orjson.dumps
+        logger.info((_ACCESS_LOG_TEMPLATE % (
+            dumps(remote_addr),
+            dumps(x_forwarded_for),
+            b'"request_body":' + _dumps(rpc_request) + b',' if rpc_request is not None else b'',
+            dumps(cache_status),
+            b'"%.2fms"' % (upstream_time * 1e3) if upstream_time else b'"n/a"',
+            b'"%.2fms"' % (total_request_time * 1e3),
+            dumps(cache_key),
+            dumps(request_uri),
+        )).decode())
+
+    def _coalesce(self, cache_key: int, fetch: Callable[[], Awaitable]) -> asyncio.Future:
         """
-        Generate a unique cache key based on the chain and request body.
-        Supports both single requests and batched requests.
+        Return the in-flight upstream fetch for a cache key, starting it if none is running,
+        so concurrent misses on the same key share a single upstream call.
         """
-        if isinstance(body, list):
-            # For batched requests
-            cleaned_bodies = []
-            for item in body:
-                item_copy = item.copy()
-                item_copy.pop('id', None)
-                cleaned_bodies.append(json.dumps(item_copy, sort_keys=True))
-            cache_key_content = f"{chain}:{':'.join(sorted(cleaned_bodies))}"
-        else:
-            # For single requests
-            body_copy = body.copy()
-            body_copy.pop('id', None)
-            cache_key_content = f"{chain}:{json.dumps(body_copy, sort_keys=True)}"
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return inflight
+
+        def on_done(task: asyncio.Future):
+            self._inflight.pop(cache_key, None)
+            if not task.cancelled():
+                task.exception()  # Waiters re-raise it themselves, don't warn if none are left
 
-        return hashlib.md5(cache_key_content.encode()).hexdigest()
+        inflight = asyncio.ensure_future(fetch())
+        self._inflight[cache_key] = inflight
+        inflight.add_done_callback(on_done)
+        return inflight
 
-    async def handle_http_request(self, chain: str, request: Request) -> Tuple[Union[Dict, List], str, str]:
+    async def handle_http_request(self, chain: str, request: Request) -> Tuple[bytes, str, Optional[str]]:
         """
         Handle an incoming HTTP JSON-RPC request, using cache if possible.
         Supports both single requests and batched requests.
+        Non-cacheable methods bypass the cache and are returned without a cache key.
+        Returns the serialized JSON response body.
         """
-        rpc_request = await request.json()
+        body = await request.body()
+        # Requests with integers beyond 64 bits are parsed exactly and forwarded as is, never cached
+        has_long_ints = _LONG_INT.search(body) is not None
+        rpc_request = json.loads(body) if has_long_ints else orjson.loads(body)
 
         start_time = time.time()
         upstream_start_time = None
         upstream_end_time = None
 
-        if chain not in config.RPC_URL:
+        chain_entry = self._chains.get(chain)
+        if chain_entry is None:
             logger.error(f"No RPC endpoint configured for chain: {chain}")
             raise HTTPException(status_code=404, detail="No RPC endpoint configured for this chain")
 
-        chain_specific_cache = self.cache.get_cache(chain, config.CACHE_TTL[chain])
+        rpc_url, ttl_ns = chain_entry
+        cache = self.cache
 
-        async def process_single_request(rpc_request: Dict) -> Tuple[Dict, str, str, Dict]:
+        def process_single_request(rpc_request: Dict) -> Tuple[Optional[bytes], str, int, Optional[Dict]]:
             cache_key = self.generate_cache_key(chain, rpc_request)
-            cached_response, cache_status = chain_specific_cache.get(cache_key)
+            cached_response, cache_status = cache.get(cache_key)
             if cache_status == "HIT":
-                response = cached_response.copy()
-                response['id'] = rpc_request.get('id')
-                return response, cache_status, cache_key, None
+                return cached_response, cache_status, cache_key, None
             else:
                 return None, cache_status, cache_key, rpc_request
 
-        async def fetch_from_rpc(rpc_request: Union[Dict, List]) -> Union[Dict, List]:
+        async def fetch_from_rpc(payload: bytes) -> bytes:
             nonlocal upstream_start_time, upstream_end_time
             try:
                 upstream_start_time = time.time()
-                async with self.session.post(config.RPC_URL[chain], json=rpc_request) as response:
-                    result = json.loads(await response.text())
+                async with self.session.post(
+                    rpc_url, data=payload, headers=_UPSTREAM_HEADERS, timeout=_UPSTREAM_TIMEOUT
+                ) as response:
+                    result = await response.read()
                 upstream_end_time = time.time()
                 return result
             except aiohttp.ClientError as error:
                 logger.error(f"Error during HTTP communication with the {chain} RPC: {str(error)}")
                 raise HTTPException(status_code=502, detail="Error communicating with node")
+            except asyncio.TimeoutError:
+                logger.error(f"Timeout during HTTP communication with the {chain} RPC")
+                raise HTTPException(status_code=504, detail="Timeout communicating with node")
 
-        if isinstance(rpc_request, list):
-            batch_response, overall_cache_status, batch_request, cache_key_map = [], "HIT", [], {}
-
-            for sub_request in rpc_request:
-                sub_response, sub_cache_status, sub_cache_key, sub_request_to_send = await process_single_request(sub_request)
-                if sub_request_to_send:
-                    cache_key_map[sub_request_to_send['id']] = sub_cache_key
-                    batch_request.append(sub_request_to_send)
-                if sub_response:
-                    batch_response.append(sub_response)
-                if sub_cache_status != "HIT":
-                    overall_cache_status = "MISS" if sub_cache_status == "MISS" else "EXPIRED"
+        async def fetch_json_from_rpc(rpc_request: Union[Dict, List]) -> Union[Dict, List]:
+            raw_response = await fetch_from_rpc(orjson.dumps(rpc_request))
+            try:
+                rpc_response = _loads(raw_response)
+            except json.JSONDecodeError:  # Base class of orjson.JSONDecodeError
+                logger.error(f"Invalid JSON response from the {chain} RPC")
+                raise HTTPException(status_code=502, detail="Invalid response from node")
+            # Responses are cached per object, so anything but an object (a list of them for a batch) is rejected
+            if isinstance(rpc_request, list):
+                valid = isinstance(rpc_response, list) and all(isinstance(item, dict) for item in rpc_response)
+            else:
+                valid = isinstance(rpc_response, dict)
+            if not valid:
+                logger.error(f"Unexpected JSON-RPC response shape from the {chain} RPC")
+                raise HTTPException(status_code=502, detail="Invalid response from node")
+            return rpc_response
+
+        final_cache_key: Optional[int]
+        if has_long_ints or (isinstance(rpc_request, dict) and rpc_request.get('method') in NON_CACHEABLE_METHODS):
+            # Forwarded untouched, the upstream response is passed through as is
+            final_response, final_cache_status, final_cache_key = await fetch_from_rpc(body), "BYPASS", None
+        elif isinstance(rpc_request, list):
+            # Key generation and lookups for all sub-requests in flat comprehensions, with methods bound once.
+            # Non-cacheable sub-requests and notifications (no id, so no response to cache) get no key
+            # and skip the lookup, they are always forwarded.
+            generate_cache_key, cache_get = self.generate_cache_key, cache.get
+            sub_cache_keys = [
+                None if 'id' not in sub_request or sub_request.get('method') in NON_CACHEABLE_METHODS
+                else generate_cache_key(chain, sub_request)
+                for sub_request in rpc_request
+            ]
+            lookups = [
+                (None, "BYPASS") if sub_cache_key is None else cache_get(sub_cache_key)
+                for sub_cache_key in sub_cache_keys
+            ]
+
+            batch_response = [
+                _with_id(cached_response, sub_request.get('id'))
+                for sub_request, (cached_response, sub_cache_status) in zip(rpc_request, lookups)
+                if sub_cache_status == "HIT"
+            ]
+            misses = [
+                (sub_request, sub_cache_key, sub_cache_status)
+                for sub_request, sub_cache_key, (_, sub_cache_status) in zip(rpc_request, sub_cache_keys, lookups)
+                if sub_cache_status != "HIT"
+            ]
+            batch_request = [sub_request for sub_request, _, _ in misses]
+            cache_key_map = {
+                sub_request['id']: sub_cache_key for sub_request, sub_cache_key, _ in misses if 'id' in sub_request
+            }
+            # Status of the last cacheable miss as before, BYPASS only if nothing else missed
+            overall_cache_status = next(
+                (status for _, _, status in reversed(misses) if status != "BYPASS"),
+                "BYPASS" if misses else "HIT"
+            )
 
             if batch_request:
-                rpc_response = await fetch_from_rpc(batch_request)
-                for sub_response in rpc_response:
-                    sub_cache_key = cache_key_map[sub_response['id']]
-                    chain_specific_cache.set(sub_cache_key, sub_response)
-                    batch_response.append(sub_response)
-
-            batch_cache_key = self.generate_cache_key(chain, rpc_request)
-            final_response, final_cache_status, final_cache_key = batch_response, overall_cache_status, batch_cache_key
+                # Few misses: overlap the upstream round trips rather than wait on one batch. Only when all of
+                # them are cacheable, non-cacheable ones (e.g. transactions with consecutive nonces) keep their order.
+                if len(batch_request) <= _MAX_SPLIT_BATCH_MISSES and all(key is not None for _, key, _ in misses):
+                    split_start_time = time.time()
+                    fetches = [asyncio.ensure_future(fetch_json_from_rpc(r)) for r in batch_request]
+                    try:
+                        rpc_response = await asyncio.gather(*fetches)
+                    except BaseException:
+                        # The request fails as a whole, don't leave the other fetches running
+                        for fetch in fetches:
+                            fetch.cancel()
+                        raise
+                    # The concurrent fetches overwrite each other's timings, time the whole split instead
+                    upstream_start_time, upstream_end_time = split_start_time, time.time()
+                    # Responses come back in request order, so they are paired by position rather than by the
+                    # echoed id, which error replies may leave out or change
+                    for (sub_request, sub_cache_key, _), sub_response in zip(misses, rpc_response):
+                        cached_sub_response = _strip_id(sub_response)
+                        cache.set(sub_cache_key, cached_sub_response, ttl_ns)
+                        batch_response.append(_with_id(cached_sub_response, sub_request.get('id')))
+                else:
+                    rpc_response = await fetch_json_from_rpc(batch_request)
+                    for sub_response in rpc_response:
+                        # Replies with an id that matches no cacheable request (e.g. null on errors) are not cached
+                        sub_response_id = sub_response.get('id')
+                        sub_cache_key = cache_key_map.get(sub_response_id)
+                        cached_sub_response = _strip_id(sub_response)
+                        if sub_cache_key is not None:
+                            cache.set(sub_cache_key, cached_sub_response, ttl_ns)
+                        batch_response.append(_with_id(cached_sub_response, sub_response_id))
+
+            # Derived from the sub-request keys instead of hashing the whole batch body again,
+            # a batch of only non-cacheable requests has no key
+            cacheable_keys = [sub_cache_key for sub_cache_key in sub_cache_keys if sub_cache_key is not None]
+            batch_cache_key = combine_cache_keys(cacheable_keys) if cacheable_keys else None
+            final_response = b'[' + b','.join(batch_response) + b']'
+            final_cache_status, final_cache_key = overall_cache_status, batch_cache_key
         else:
-            single_response, single_cache_status, single_cache_key, single_request = await process_single_request(rpc_request)
+            single_response, single_cache_status, single_cache_key, single_request = process_single_request(rpc_request)
 
             if single_request:
-                single_response = await fetch_from_rpc(rpc_request)
-                chain_specific_cache.set(single_cache_key, single_response)
+                async def fetch_and_cache() -> bytes:
+                    response = _strip_id(await fetch_json_from_rpc(rpc_request))
+                    cache.set(single_cache_key, response, ttl_ns)
+                    return response
 
-            final_response, final_cache_status, final_cache_key = single_response, single_cache_status, single_cache_key
+                inflight = self._coalesce(single_cache_key, fetch_and_cache)
+                # Shielded so a cancelled request doesn't abort the fetch other requests are waiting on
+                single_response = await asyncio.shield(inflight)
+
+            final_response = _with_id(single_response, rpc_request.get('id'))
+            final_cache_status, final_cache_key = single_cache_status, single_cache_key
+
+        cache_key_header: Optional[str] = f"{final_cache_key:016x}" if final_cache_key is not None else None
 
         total_request_time = (time.time() - start_time)
         upstream_time = (upstream_end_time - upstream_start_time) if upstream_start_time and upstream_end_time else None
 
-        logger.info(json.dumps({
-            "remote_addr": request.client.host,
-            "x_forwarded_for": request.headers.get("X-Forwarded-For", "n/a"),
-            "request_body": json.dumps(rpc_request),
-            "status": "200",
-            "upstream_cache_status": final_cache_status,
-            "upstream_response_time": f"{upstream_time * 1e3:.2f}ms" if upstream_time else "n/a",
-            "total_response_time": f"{total_request_time * 1e3:.2f}ms",
-            "cache_key": final_cache_key,
-            "request_uri": request.url.path,
-        }))
-
-        self.cache_statuses.append(final_cache_status)
+        if _LOG_INFO:
+            try:
+                self._log_queue.put_nowait((
+                    request.client.host,
+                    request.headers.get("X-Forwarded-For", "n/a"),
+                    rpc_request if _LOG_DEBUG else None,
+                    final_cache_status,
+                    upstream_time,
+                    total_request_time,
+                    cache_key_header,
+                    request.url.path,
+                ))
+            except asyncio.QueueFull:
+                pass  # Drop the log line rather than slow down the request
+
+        self._record_cache_status(final_cache_status)
         self._log_cache_ratio()
 
-        return final_response, final_cache_status, final_cache_key
+        return final_response, final_cache_status, cache_key_header
+
+    def _record_cache_status(self, cache_status: str):
+        """
+        Append a cache status to the window and keep the running counts in sync,
+        so the ratio log never has to rescan the window.
+        """
+        index = self.cache_status_index
+        evicted_status = self.cache_statuses[index]
+        if evicted_status is not None:
+            self.cache_status_counts[evicted_status] -= 1
+        self.cache_statuses[index] = cache_status
+        self.cache_status_counts[cache_status] += 1
+        self.cache_status_index = (index + 1) % len(self.cache_statuses)
 
     def _log_cache_ratio(self):
         now = time.time()
         if now - self.last_ratio_log >= 10:  # Log every 10 seconds
-            total_requests = len(self.cache_statuses)
+            total_requests = sum(self.cache_status_counts.values())
             if total_requests > 0:
-                hit_count = self.cache_statuses.count("HIT")
-                miss_count = self.cache_statuses.count("MISS")
-                expired_count = self.cache_statuses.count("EXPIRED")
+                hit_count = self.cache_status_counts["HIT"]
+                miss_count = self.cache_status_counts["MISS"]
+                expired_count = self.cache_status_counts["EXPIRED"]
+                bypass_count = self.cache_status_counts["BYPASS"]
 
                 hit_ratio = hit_count / total_requests * 100
                 miss_ratio = miss_count / total_requests * 100
                 expired_ratio = expired_count / total_requests * 100
+                bypass_ratio = bypass_count / total_requests * 100
 
                 logger.info(
                     f"Cache Ratio (last {total_requests} requests): "
                     f"HIT: {hit_count} ({hit_ratio:.2f}%), "
                     f"MISS: {miss_count} ({miss_ratio:.2f}%), "
-                    f"EXPIRED: {expired_count} ({expired_ratio:.2f}%)"
+                    f"EXPIRED: {expired_count} ({expired_ratio:.2f}%), "
+                    f"BYPASS: {bypass_count} ({bypass_ratio:.2f}%)"
                 )
 
             self.last_ratio_log = now
@@ -189,16 +462,15 @@ async def http_endpoint(chain: str, request: Request):
     """
     FastAPI route handler for HTTP JSON-RPC requests.
     """
+    chain = sys.intern(chain)  # Chain keys are interned too, so lookups hit the identity fast path
     response, cache_status, cache_key = await proxy.handle_http_request(chain, request)
 
-    # Create a JSONResponse with the additional headers
-    return JSONResponse(
-        content=response,
-        headers={
-            "X-Cache-Status": cache_status,
-            "X-Cache-Key": cache_key,
-        }
-    )
+    headers = {"X-Cache-Status": cache_status}
+    if cache_key is not None:
+        headers["X-Cache-Key"] = cache_key
+
+    # The response body is already serialized, send it as is with the additional headers
+    return Response(content=response, media_type="application/json", headers=headers)
 
 
 @app.websocket("/{chain}/ws")
@@ -216,47 +488,55 @@ async def websocket_endpoint(client_ws: WebSocket, chain: str):
             logger.debug(f"Established Proxy<>RPC websocket connection for {client_id}<>Proxy<>{chain} connection")
 
             async def forward_to_client():
+                # Bound once, this is the hottest loop for subscription streams
+                receive = rpc_ws.receive
+                send_text = client_ws.send_text
+                text = aiohttp.WSMsgType.TEXT
+                closing = (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR)
                 try:
-                    while not connection_closed.is_set():
-                        try:
-                            message = await asyncio.wait_for(rpc_ws.receive(), timeout=1.0)
-                            if message.type == aiohttp.WSMsgType.TEXT:
-                                if not connection_closed.is_set():
-                                    await client_ws.send_text(message.data)
-                            elif message.type == aiohttp.WSMsgType.CLOSE:
-                                break
-                        except asyncio.TimeoutError:
-                            continue
+                    while True:
+                        message = await receive()
+                        message_type = message.type
+                        if message_type is text:
+                            await send_text(message.data)
+                        elif message_type in closing:
+                            break
                 except Exception as e:
                     if not connection_closed.is_set():
                         logger.error(f"Websocket error for {client_id}<>Proxy<>{chain} connection: {str(e)}")
 
             async def forward_to_rpc():
+                receive_text = client_ws.receive_text
+                send_str = rpc_ws.send_str
                 try:
-                    while not connection_closed.is_set():
-                        try:
-                            data = await asyncio.wait_for(client_ws.receive_text(), timeout=1.0)
-                            if len(data) > 0:
-                                await rpc_ws.send_str(data)
+                    while True:
+                        data = await receive_text()
+                        if data:
+                            await send_str(data)
 
-                                logger.info(json.dumps({
+                            if _LOG_INFO:
+                                logger.info(orjson.dumps({
                                     "client_id": client_id,
                                     "request_body": data,
                                     "status": "200",
                                     "request_uri": f"/{chain}/ws",
                                     "connection_type": "websocket"
-                                }))
-                        except asyncio.TimeoutError:
-                            continue
+                                }).decode())
                 except WebSocketDisconnect:
                     connection_closed.set()
                     logger.debug(f"Closed Proxy<>RPC websocket connection for {client_id}<>Proxy<>{chain} connection")
 
-            # Run both forwarding tasks concurrently
-            await asyncio.gather(
-                forward_to_client(),
-                forward_to_rpc()
+            # Run both forwarding tasks until either side is done, then stop the other one.
+            # Both block on their receive call, so idle connections cost no wakeups.
+            done, pending = await asyncio.wait(
+                {asyncio.ensure_future(forward_to_client()), asyncio.ensure_future(forward_to_rpc())},
+                return_when=asyncio.FIRST_COMPLETED
             )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                task.result()  # Re-raise errors for the handler below
     except ValueError as e:
         logger.error(f"WebSocket configuration error for {client_id}<>Proxy<>{chain} connection: {str(e)}")
         await client_ws.close(code=1008, reason=str(e))  # Close with HTTP 404 equivalent
@@ -275,9 +555,12 @@ async def websocket_endpoint(client_ws: WebSocket, chain: str):
 if __name__ == "__main__":
     logger.info(f"Starting JSON-RPC Cache Proxy on {config.HOST}:{config.PORT}")
     uvicorn.run(
-        app,
+        "main:app",
         host=config.HOST,
         port=config.PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=config.WORKERS,  # Each worker process keeps its own cache
         log_level='error',  # This will only show error logs
         access_log=False  # This will disable access logs
     )
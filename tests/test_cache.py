@@ -0,0 +1,84 @@
+import unittest
+
+import orjson
+
+from cache import TTLCache
+from main import _strip_id, _with_id
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+
+class TTLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(maxsize=3)
+        self.cache._time = self.clock
+
+    def test_miss_and_hit(self):
+        self.assertEqual(self.cache.get(1), (None, "MISS"))
+        self.cache.set(1, b'value', ttl_ns=10)
+        self.assertEqual(self.cache.get(1), (b'value', "HIT"))
+
+    def test_expired_entry_is_gone_after_get(self):
+        self.cache.set(1, b'value', ttl_ns=10)
+        self.clock.now = 11
+        self.assertEqual(self.cache.get(1), (b'value', "EXPIRED"))
+        self.assertNotIn(1, self.cache.values)
+        self.assertNotIn(1, self.cache.expiries)
+        self.assertEqual(self.cache.get(1), (None, "MISS"))
+
+    def test_set_purges_expired_entries(self):
+        self.cache.set(1, b'short', ttl_ns=5)
+        self.cache.set(2, b'long', ttl_ns=100)
+        self.clock.now = 6
+        self.cache.set(3, b'new', ttl_ns=100)
+        self.assertNotIn(1, self.cache.values)
+        self.assertNotIn(1, self.cache.expiries)
+        self.assertEqual(self.cache.get(2), (b'long', "HIT"))
+
+    def test_purge_skips_overwritten_entries(self):
+        self.cache.set(1, b'old', ttl_ns=5)
+        self.cache.set(1, b'new', ttl_ns=100)
+        self.clock.now = 6
+        self.cache.set(2, b'other', ttl_ns=100)
+        self.assertEqual(self.cache.get(1), (b'new', "HIT"))
+
+    def test_evicts_least_recently_used(self):
+        for key in (1, 2, 3):
+            self.cache.set(key, key, ttl_ns=100)
+        self.cache.get(1)
+        self.cache.set(4, 4, ttl_ns=100)
+        self.assertEqual(self.cache.get(2), (None, "MISS"))
+        self.assertEqual(self.cache.get(1), (1, "HIT"))
+
+    def test_expiry_heap_stays_bounded(self):
+        for i in range(1000):
+            self.cache.set(i % 2, i, ttl_ns=10 ** 12)
+        self.assertLessEqual(len(self.cache.expiry_heap), 2 * self.cache.maxsize)
+        self.assertEqual(self.cache.get(1), (999, "HIT"))
+
+
+class CachedResponseTest(unittest.TestCase):
+    def test_round_trip(self):
+        response = {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+        cached = _strip_id(response)
+        self.assertEqual(orjson.loads(_with_id(cached, 7)), {"jsonrpc": "2.0", "id": 7, "result": "0x1"})
+        self.assertEqual(orjson.loads(_with_id(cached, "abc")), {"jsonrpc": "2.0", "id": "abc", "result": "0x1"})
+
+    def test_round_trip_without_other_members(self):
+        self.assertEqual(orjson.loads(_with_id(_strip_id({}), 1)), {"id": 1})
+        self.assertEqual(orjson.loads(_with_id(_strip_id({"id": 5}), None)), {"id": None})
+
+    def test_keeps_integers_beyond_64_bits(self):
+        cached = _strip_id({"id": 1, "result": 2 ** 70})
+        self.assertEqual(_with_id(cached, 2), b'{"id":2,"result":1180591620717411303424}')
+
+
+if __name__ == "__main__":
+    unittest.main()
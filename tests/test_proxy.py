@@ -0,0 +1,188 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+import orjson
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import HTTPException, Request
+from yarl import URL
+
+import main
+from main import JSONRPCCacheProxy
+
+
+def make_request(body) -> Request:
+    """
+    Build the incoming request the handler sees for a JSON-RPC body.
+    """
+    async def receive():
+        return {"type": "http.request", "body": orjson.dumps(body), "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/test",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+    }
+    return Request(scope, receive)
+
+
+def answer(rpc_request: dict) -> dict:
+    return {"jsonrpc": "2.0", "id": rpc_request.get("id"), "result": rpc_request.get("method")}
+
+
+class ProxyTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Upstream requests received so far, the reply and delays can be changed per test
+        self.calls = []
+        self.reply = self.default_reply
+        self.delay = 0.05
+        self.method_delays = {}
+
+        async def handler(request: web.Request) -> web.Response:
+            body = await request.json()
+            self.calls.append(body)
+            method = body.get("method") if isinstance(body, dict) else None
+            await asyncio.sleep(self.method_delays.get(method, self.delay))
+            return self.reply(body)
+
+        app = web.Application()
+        app.router.add_post("/", handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        patcher = mock.patch.object(main, "_LOG_INFO", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.proxy = JSONRPCCacheProxy()
+        self.proxy._chains = {"test": (URL(str(self.server.make_url("/"))), 60 * 10 ** 9)}
+        self.proxy.session = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        await self.proxy.session.close()
+        await self.server.close()
+
+    @staticmethod
+    def default_reply(body) -> web.Response:
+        if isinstance(body, list):
+            return web.json_response([answer(item) for item in body if "id" in item])
+        return web.json_response(answer(body))
+
+    async def call(self, body):
+        response, cache_status, cache_key = await self.proxy.handle_http_request("test", make_request(body))
+        return orjson.loads(response), cache_status, cache_key
+
+    async def test_concurrent_misses_share_one_upstream_call(self):
+        results = await asyncio.gather(*[
+            self.call({"jsonrpc": "2.0", "id": i, "method": "eth_blockNumber", "params": []}) for i in range(10)
+        ])
+
+        self.assertEqual(len(self.calls), 1)
+        for i, (response, cache_status, _) in enumerate(results):
+            self.assertEqual(response, {"id": i, "jsonrpc": "2.0", "result": "eth_blockNumber"})
+            self.assertEqual(cache_status, "MISS")
+        self.assertEqual(self.proxy._inflight, {})
+
+        response, cache_status, _ = await self.call({"jsonrpc": "2.0", "id": 99, "method": "eth_blockNumber", "params": []})
+        self.assertEqual((response["id"], cache_status), (99, "HIT"))
+        self.assertEqual(len(self.calls), 1)
+
+    async def test_leader_error_reaches_all_waiters(self):
+        self.reply = lambda body: web.Response(text="<html>rate limited</html>", content_type="text/html")
+
+        results = await asyncio.gather(*[
+            self.call({"jsonrpc": "2.0", "id": i, "method": "eth_blockNumber", "params": []}) for i in range(5)
+        ], return_exceptions=True)
+
+        self.assertEqual(len(self.calls), 1)
+        for result in results:
+            self.assertIsInstance(result, HTTPException)
+            self.assertEqual(result.status_code, 502)
+        self.assertEqual(self.proxy._inflight, {})
+
+    async def test_cancelled_waiter_does_not_abort_shared_fetch(self):
+        first = asyncio.ensure_future(self.call({"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}))
+        second = asyncio.ensure_future(self.call({"jsonrpc": "2.0", "id": 2, "method": "eth_chainId", "params": []}))
+        while not self.calls:
+            await asyncio.sleep(0.001)
+
+        first.cancel()
+        response, cache_status, _ = await second
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual((response["id"], cache_status), (2, "MISS"))
+        self.assertEqual(len(self.calls), 1)
+        _, cache_status, _ = await self.call({"jsonrpc": "2.0", "id": 3, "method": "eth_chainId", "params": []})
+        self.assertEqual(cache_status, "HIT")
+
+    async def test_non_cacheable_method_bypasses_cache(self):
+        body = {"jsonrpc": "2.0", "id": 1, "method": "eth_sendRawTransaction", "params": ["0x1"]}
+        for _ in range(2):
+            response, cache_status, cache_key = await self.call(body)
+            self.assertEqual((response["id"], cache_status, cache_key), (1, "BYPASS", None))
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_batch_forwards_non_cacheable_items_and_notifications(self):
+        batch = [
+            {"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []},
+            {"jsonrpc": "2.0", "id": 2, "method": "eth_sendRawTransaction", "params": ["0x1"]},
+            {"jsonrpc": "2.0", "method": "eth_notify", "params": []},
+        ]
+        response, cache_status, cache_key = await self.call(batch)
+        self.assertEqual(sorted(item["id"] for item in response), [1, 2])
+        self.assertEqual(cache_status, "MISS")
+        self.assertIsNotNone(cache_key)
+        # Non-cacheable items keep their order in one batched request
+        self.assertEqual(self.calls, [batch])
+
+        response, cache_status, _ = await self.call(batch)
+        self.assertEqual(cache_status, "BYPASS")
+        self.assertEqual(self.calls[1], batch[1:])
+
+    async def test_small_batch_misses_are_split_and_paired_by_position(self):
+        # Error replies may leave out the id, responses must still line up with their requests
+        self.reply = lambda body: web.json_response({"jsonrpc": "2.0", "result": body["method"]})
+        batch = [
+            {"jsonrpc": "2.0", "id": 1, "method": "eth_a", "params": []},
+            {"jsonrpc": "2.0", "id": 1, "method": "eth_b", "params": []},
+        ]
+        response, cache_status, _ = await self.call(batch)
+
+        self.assertEqual(cache_status, "MISS")
+        self.assertEqual(sorted(self.calls, key=lambda call: call["method"]), batch)
+        self.assertEqual(sorted(item["result"] for item in response), ["eth_a", "eth_b"])
+
+        response, cache_status, _ = await self.call([dict(batch[1], id=7)])
+        self.assertEqual((response, cache_status), ([{"id": 7, "jsonrpc": "2.0", "result": "eth_b"}], "HIT"))
+
+    async def test_split_fetch_failure_cancels_siblings(self):
+        def reply(body) -> web.Response:
+            if body["method"] == "eth_bad":
+                return web.Response(text="not json")
+            return web.json_response(answer(body))
+
+        self.reply = reply
+        self.method_delays = {"eth_bad": 0, "eth_slow": 5}
+        batch = [
+            {"jsonrpc": "2.0", "id": 1, "method": "eth_bad", "params": []},
+            {"jsonrpc": "2.0", "id": 2, "method": "eth_slow", "params": []},
+        ]
+        with self.assertRaises(HTTPException) as context:
+            await self.call(batch)
+        self.assertEqual(context.exception.status_code, 502)
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+        pending_fetches = [
+            task for task in asyncio.all_tasks() if "fetch_json_from_rpc" in task.get_coro().__qualname__
+        ]
+        self.assertEqual(pending_fetches, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
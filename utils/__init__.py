@@ -1,3 +1,3 @@
-from .logger import logger
+from .logger import logger, is_level_enabled
 
-__all__ = ['logger']
+__all__ = ['logger', 'is_level_enabled']
@@ -12,16 +12,28 @@ def setup_logger():
     # Remove the default logger
     logger.remove()
 
-    # Add a new sink to stdout with a custom format
+    # Add a new sink to stdout with a custom format. enqueue=True hands records to a background
+    # thread, so formatting and the write to stdout stay off the event loop.
     logger.add(
         sys.stdout,
         colorize=True,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
-        level=config.LOG_LEVEL
+        level=config.LOG_LEVEL,
+        enqueue=True
     )
 
     return logger
 
 
+def is_level_enabled(level: str) -> bool:
+    """
+    Check whether messages of the given level pass the configured log level.
+
+    :param level: Name of the level, e.g. "INFO"
+    :return: True if such messages are emitted
+    """
+    return logger.level(level).no >= logger.level(config.LOG_LEVEL).no
+
+
 # Create and configure the logger
 logger = setup_logger()